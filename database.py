@@ -6,31 +6,71 @@ Import and use these functions in your API endpoints for database operations.
 """
 
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import Optional, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Motor (asyncio) handle, used by the async endpoints
+_async_client = None
+async_db = None
+# The blocking pymongo client (its pool and monitor threads) is only created on
+# first use by the sync helpers below; see get_db()
 _client = None
-db = None
 
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
-    db = _client[database_name]
+    _async_client = AsyncIOMotorClient(database_url)
+    async_db = _async_client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
-    if db is None:
-        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+def get_db():
+    """Blocking pymongo handle on the configured database, or None if none is configured"""
+    global _client
+    if not (database_url and database_name):
+        return None
+    if _client is None:
+        _client = MongoClient(database_url)
+    return _client[database_name]
 
+def __getattr__(name: str):
+    # Keeps `from database import db` working without connecting at import time
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def epoch_seconds(value) -> Optional[int]:
+    """Epoch seconds for a datetime or ISO string; naive values are taken as UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+# Stored in start_ts/end_ts for an open-ended announcement window, so the active
+# filter is two plain range conditions the compound index can serve
+ANN_OPEN_START = -(1 << 62)
+ANN_OPEN_END = 1 << 62
+
+def with_announcement_epochs(data: dict) -> dict:
+    """Set the integer start_ts/end_ts columns the active-announcement filter queries"""
+    # start_at/end_at are kept as-is for display
+    start_ts = epoch_seconds(data.get("start_at"))
+    end_ts = epoch_seconds(data.get("end_at"))
+    data["start_ts"] = ANN_OPEN_START if start_ts is None else start_ts
+    data["end_ts"] = ANN_OPEN_END if end_ts is None else end_ts
+    return data
+
+def _timestamped(collection_name: str, data: Union[BaseModel, dict]) -> dict:
+    """Copy a model or dict into a new document with created/updated timestamps"""
     # Convert Pydantic model to dict if needed
     if isinstance(data, BaseModel):
         data_dict = data.model_dump()
@@ -39,12 +79,32 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
 
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
+    if collection_name == "announcement":
+        # Without these an announcement never matches the active filter
+        with_announcement_epochs(data_dict)
+    return data_dict
+
+# Helper functions for common database operations
+def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    db = get_db()
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = db[collection_name].insert_one(_timestamped(collection_name, data))
+    return str(result.inserted_id)
+
+async def create_document_async(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp without blocking the event loop"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await async_db[collection_name].insert_one(_timestamped(collection_name, data))
     return str(result.inserted_id)
 
 def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
+    db = get_db()
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
@@ -1,69 +1,577 @@
 import os
+import re
+import time
+import secrets
+import shutil
+import hashlib
+import heapq
+import functools
+import logging
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-import json
+from typing import Optional, List, Dict, Any, Tuple, Protocol, AsyncIterator, BinaryIO, Iterable, Iterator
+import asyncio
 import mimetypes
+import threading
 import csv
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import aiofiles
+import aiofiles.os
+import orjson
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
-from database import db, create_document
+from database import (
+    async_db as db, create_document_async,
+    ANN_OPEN_START, ANN_OPEN_END, with_announcement_epochs,
+)
 from schemas import SalahTime, Announcement, Asset
 
-app = FastAPI(title="Masjid Display Backend")
+logger = logging.getLogger(__name__)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app = FastAPI(title="Masjid Display Backend", default_response_class=ORJSONResponse)
+
+
+# Comma-separated list of origins allowed to call the API ("*" for any).
+# Set it empty for same-origin deployments to skip the CORS middleware entirely.
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",") if o.strip()]
+if ALLOWED_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        # Browsers reject credentialed requests against a wildcard origin
+        allow_credentials="*" not in ALLOWED_ORIGINS,
+        allow_methods=["GET", "POST"],
+        allow_headers=["*"],
+    )
 
 # Ensure uploads directory exists and is served statically
 UPLOAD_DIR = os.path.join(os.getcwd(), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# Uploads are streamed to disk in 1 MiB chunks; MAX_UPLOAD_BYTES=0 disables the size limit
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", "0"))
+# In production a reverse proxy should serve /uploads straight from disk with
+# sendfile (see deploy/nginx.conf); set SERVE_UPLOADS_FROM_APP=0 there
+if os.getenv("SERVE_UPLOADS_FROM_APP", "1") == "1":
+    app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 # Fallback data directory for when DB is unavailable
 DATA_DIR = os.path.join(os.getcwd(), "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 SALAHS_FILE = os.path.join(DATA_DIR, "salah.json")
 ANN_FILE = os.path.join(DATA_DIR, "announcements.json")
+# Seconds to wait after a fallback write before rewriting the JSON file
+FLUSH_DELAY = 0.5
+
+
+# Parsed JSON files keyed by path and tagged with their st_mtime_ns, so re-reading
+# an unchanged file is a stat plus a dict lookup. Callers must not mutate results.
+_FILE_CACHE_SIZE = 16
+_json_cache: Dict[str, Tuple[int, Any]] = {}
+# Parsers run in asyncio.to_thread workers; serialises the evict-then-insert below
+_file_cache_lock = threading.Lock()
+
+
+def _remember_file(cache: Dict[str, Tuple[int, Any]], path: str, mtime_ns: int, value: Any) -> None:
+    """Store a per-file value tagged with its mtime, evicting the oldest path when full"""
+    with _file_cache_lock:
+        if path not in cache and len(cache) >= _FILE_CACHE_SIZE:
+            cache.pop(next(iter(cache)))
+        cache[path] = (mtime_ns, value)
 
 
 def _read_json(path: str) -> Any:
     try:
-        if not os.path.exists(path):
-            return None
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        mtime_ns = os.stat(path).st_mtime_ns
+        hit = _json_cache.get(path)
+        if hit is not None and hit[0] == mtime_ns:
+            return hit[1]
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    except Exception:
+        return None
+    _remember_file(_json_cache, path, mtime_ns, data)
+    return data
+
+
+async def _read_json_async(path: str) -> Any:
+    """_read_json for async code paths: the file is read through aiofiles"""
+    try:
+        async with aiofiles.open(path, "rb") as f:
+            return orjson.loads(await f.read())
     except Exception:
         return None
 
 
 def _write_json(path: str, data: Any) -> None:
     tmp = f"{path}.tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False)
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(data))
     os.replace(tmp, path)
 
 
+# Short-lived in-process cache for the GET endpoints that display screens poll;
+# entries are keyed by name and dropped early by the matching store writes
+SALAH_CACHE_TTL = 30
+ANN_CACHE_TTL = 15
+ASSETS_CACHE_TTL = 30
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _cache_get(key: str) -> Any:
+    hit = _cache.get(key)
+    if hit is None or hit[0] < time.monotonic():
+        return None
+    return hit[1]
+
+
+def _cache_set(key: str, value: Any, ttl: float) -> Any:
+    _cache[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+def _cache_invalidate(prefix: str) -> None:
+    for key in [k for k in _cache if k.startswith(prefix)]:
+        _cache.pop(key, None)
+
+
+# Display screens poll the GET endpoints; each response carries a strong ETag so
+# an unchanged payload is answered with an empty 304. The encoded body is kept
+# per endpoint and reused while the store hands back the very same object
+# (cached results and JSON store entries are replaced, never mutated).
+_encoded: Dict[str, Tuple[Any, bytes, str]] = {}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _json_with_etag(request: Request, payload: Any, memo_key: Optional[str] = None) -> Response:
+    hit = _encoded.get(memo_key) if memo_key else None
+    if hit is not None and hit[0] is payload:
+        body, etag = hit[1], hit[2]
+    else:
+        body = orjson.dumps(payload)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if memo_key:
+            _encoded[memo_key] = (payload, body, etag)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _is_newer(saved: Any, stored: Any) -> bool:
+    """Whether the saved updated_at (ISO string) is later than the stored one"""
+    if not saved:
+        return False
+    if not stored:
+        return True
+    if isinstance(stored, datetime):
+        stored = stored.isoformat()
+    return str(saved) > str(stored)
+
+
+# Content types for the extensions the display actually receives; anything else
+# goes through mimetypes, which loads the system mime.types on first use
+_EXT_CT = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+    ".mp4": "video/mp4",
+    ".pdf": "application/pdf",
+    ".csv": "text/csv",
+    ".json": "application/json",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _content_type_for(ext: str) -> str:
+    """Content type for a lowercased file extension; uploads share a handful of extensions"""
+    ctype = _EXT_CT.get(ext)
+    if ctype is None:
+        ctype, _ = mimetypes.guess_type(f"file{ext}")
+    return ctype or "application/octet-stream"
+
+
+# ---------------- Stores ----------------
+# Salah times, announcements and asset metadata live in MongoDB when it is
+# configured and in the JSON files under DATA_DIR otherwise. Both backends
+# implement Store, and the endpoints only ever talk to STORE.
+
+class Store(Protocol):
+    fallback: bool
+
+    async def start(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+    async def today_salah(self, today: str) -> Dict[str, Any]: ...
+
+    async def get_salah(self, d: str) -> Dict[str, Any]: ...
+
+    def recent_salah(self, limit: int) -> AsyncIterator[Dict[str, Any]]: ...
+
+    async def upsert_salah(self, d: str, fields: Dict[str, Any]) -> None: ...
+
+    async def upsert_salah_many(self, rows: Dict[str, Dict[str, Any]]) -> None: ...
+
+    async def active_announcements(self, now: int) -> List[Dict[str, Any]]: ...
+
+    async def create_announcement(self, item: Announcement) -> Any: ...
+
+    async def list_assets(self, limit: int) -> List[Dict[str, Any]]: ...
+
+    async def record_asset(self, asset: Asset) -> None: ...
+
+
+# Display screens only render these fields, and never more than a screenful
+ANN_FIELDS = ("message", "priority", "start_at", "end_at")
+ANN_PROJECTION = {"_id": 0, **{k: 1 for k in ANN_FIELDS}}
+ANN_LIMIT = 50
+
+# Indexes matching the query shapes below. The announcement index follows the
+# equality -> sort -> range order (active, priority, start_ts/end_ts).
+_INDEXES = [
+    ("announcement", [("active", 1), ("priority", -1), ("start_ts", 1), ("end_ts", 1)], {}),
+    ("salahtime", [("date", -1)], {"unique": True}),
+    ("asset", [("created_at", -1)], {}),
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _active_filter(now: int) -> Dict[str, Any]:
+    """Active-announcement filter; now is a bucketed timestamp, so this is built once per bucket"""
+    return {"active": True, "start_ts": {"$lte": now}, "end_ts": {"$gte": now}}
+
+
+# Records which versions of the fallback files have been pushed to Mongo
+FALLBACK_IMPORTS = "fallback_import"
+
+
+class MongoStore:
+    """MongoDB-backed store; hot reads are served through the TTL cache above"""
+    fallback = False
+
+    def __init__(self, database, salah_file: str, ann_file: str):
+        self.db = database
+        self.salah_file = salah_file
+        self.ann_file = ann_file
+
+    async def start(self) -> None:
+        # Build the indexes concurrently; a failure (e.g. duplicate dates already
+        # stored) is swallowed because serving must not depend on it
+        await asyncio.gather(
+            *(self.db[collection].create_index(keys, **options) for collection, keys, options in _INDEXES),
+            return_exceptions=True,
+        )
+        for step in (self._import_fallback_files, self._backfill_announcement_epochs):
+            try:
+                await step()
+            except Exception:
+                pass
+
+    async def _import_fallback_files(self) -> None:
+        """
+        Push data saved by JSONStore while the database was unavailable.
+        The files stay where they are; each imported version is recorded in
+        FALLBACK_IMPORTS by content hash. Inserting that marker is the claim,
+        so one worker imports a given version once, and a failed import drops
+        its marker to be retried on the next start.
+        """
+        imports = self.db[FALLBACK_IMPORTS]
+        for path, step in ((self.salah_file, self._import_salah), (self.ann_file, self._import_announcements)):
+            try:
+                async with aiofiles.open(path, "rb") as f:
+                    raw = await f.read()
+            except OSError:
+                continue
+            marker = {"_id": f"{os.path.basename(path)}:{hashlib.sha256(raw).hexdigest()}"}
+            try:
+                await imports.insert_one(marker)
+            except DuplicateKeyError:
+                # Already imported, or another worker is importing it now
+                continue
+            try:
+                await step(orjson.loads(raw))
+            except Exception:
+                logger.exception("Importing %s into the database failed; will retry on next start", path)
+                await imports.delete_one(marker)
+
+    async def _import_salah(self, salah: Any) -> None:
+        """Upsert saved dates Mongo doesn't have, or has an older updated_at for"""
+        rows = {}
+        for d, doc in (salah or {}).items():
+            if not isinstance(doc, dict):
+                logger.warning("Skipping saved salah entry %r: not an object", d)
+                continue
+            fields = {k: v for k, v in doc.items() if k != "date" and v not in (None, "")}
+            if any(k in fields for k in PRAYER_KEYS):
+                rows[d] = fields
+        if not rows:
+            return
+        cur = self.db["salahtime"].find({"date": {"$in": list(rows)}}, {"_id": 0, "date": 1, "updated_at": 1})
+        stored = {doc["date"]: doc.get("updated_at") async for doc in cur}
+        ops = [
+            UpdateOne({"date": d}, {"$set": fields}, upsert=True)
+            for d, fields in rows.items()
+            if d not in stored or _is_newer(fields.get("updated_at"), stored[d])
+        ]
+        if ops:
+            await self.db["salahtime"].bulk_write(ops, ordered=False)
+            _cache_invalidate("salah:")
+
+    async def _import_announcements(self, announcements: Any) -> None:
+        # Keyed on (message, created_at) so a retried import doesn't insert twice
+        ops = []
+        for it in announcements or []:
+            # One bad entry shouldn't keep the rest out of the database
+            try:
+                doc = with_announcement_epochs(Announcement.model_validate(it).model_dump())
+                created_at = datetime.fromisoformat(it["created_at"]) if it.get("created_at") else None
+            except Exception as e:
+                logger.warning("Skipping invalid saved announcement %r: %s", it, e)
+                continue
+            doc["created_at"] = doc["updated_at"] = created_at
+            ops.append(UpdateOne({"message": doc["message"], "created_at": created_at}, {"$setOnInsert": doc}, upsert=True))
+        if ops:
+            await self.db["announcement"].bulk_write(ops, ordered=False)
+            _cache_invalidate("announcements")
+
+    async def _backfill_announcement_epochs(self) -> None:
+        """
+        Fill start_ts/end_ts on announcements stored before those columns existed,
+        or before open-ended windows were stored as ANN_OPEN_START/ANN_OPEN_END
+        """
+        cur = self.db["announcement"].find(
+            {"$or": [{"start_ts": None}, {"end_ts": None}]},  # also matches a missing field
+            {"start_at": 1, "end_at": 1},
+        )
+        ops = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": with_announcement_epochs({k: doc.get(k) for k in ("start_at", "end_at")})})
+            async for doc in cur
+        ]
+        if ops:
+            await self.db["announcement"].bulk_write(ops, ordered=False)
+
+    async def close(self) -> None:
+        pass
+
+    async def today_salah(self, today: str) -> Dict[str, Any]:
+        key = f"salah:today:{today}"
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        return _cache_set(key, await self.get_salah(today), SALAH_CACHE_TTL)
+
+    async def get_salah(self, d: str) -> Dict[str, Any]:
+        doc = await self.db["salahtime"].find_one({"date": d}, {"_id": 0})
+        return doc or {"date": d}
+
+    async def recent_salah(self, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        async for doc in self.db["salahtime"].find({}, {"_id": 0}).sort("date", -1).limit(limit):
+            yield doc
+
+    async def upsert_salah(self, d: str, fields: Dict[str, Any]) -> None:
+        await self.db["salahtime"].update_one({"date": d}, {"$set": fields}, upsert=True)
+        _cache_invalidate("salah:")
+
+    async def upsert_salah_many(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        # One round trip for a whole batch of dates
+        if not rows:
+            return
+        ops = [UpdateOne({"date": d}, {"$set": fields}, upsert=True) for d, fields in rows.items()]
+        await self.db["salahtime"].bulk_write(ops, ordered=False)
+        _cache_invalidate("salah:")
+
+    async def active_announcements(self, now: int) -> List[Dict[str, Any]]:
+        cached = _cache_get("announcements")
+        if cached is not None and cached[0] == now:
+            return cached[1]
+        cur = self.db["announcement"].find(_active_filter(now), ANN_PROJECTION).sort("priority", -1).limit(ANN_LIMIT)
+        items = await cur.to_list(length=ANN_LIMIT)
+        _cache_set("announcements", (now, items), ANN_CACHE_TTL)
+        return items
+
+    async def create_announcement(self, item: Announcement) -> Any:
+        # create_document_async fills in start_ts/end_ts for announcements
+        _id = await create_document_async("announcement", item.model_dump())
+        _cache_invalidate("announcements")
+        return _id
+
+    async def list_assets(self, limit: int) -> List[Dict[str, Any]]:
+        key = f"assets:{limit}"
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        cur = self.db["asset"].find({}, {"_id": 0}).sort("created_at", -1).limit(limit)
+        return _cache_set(key, await cur.to_list(length=limit), ASSETS_CACHE_TTL)
+
+    async def record_asset(self, asset: Asset) -> None:
+        await create_document_async("asset", asset)
+        _cache_invalidate("assets:")
+
+
+class JSONStore:
+    """
+    File-backed store used when no database is configured.
+    Both JSON files are loaded into memory at startup; writes update memory
+    first and are flushed to disk FLUSH_DELAY seconds later, batching bursts.
+    """
+    fallback = True
+
+    def __init__(self, salah_file: str, ann_file: str, upload_dir: str):
+        self.salah_file = salah_file
+        self.ann_file = ann_file
+        self.upload_dir = upload_dir
+        self.salah: Dict[str, Dict[str, Any]] = {}
+        self.announcements: List[Dict[str, Any]] = []
+        self._dirty: set = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.salah.update(await _read_json_async(self.salah_file) or {})
+        self.announcements.extend(await _read_json_async(self.ann_file) or [])
+        # Entries written before start_ts/end_ts (or their open-window sentinels) existed
+        for it in self.announcements:
+            if it.get("start_ts") is None or it.get("end_ts") is None:
+                try:
+                    with_announcement_epochs(it)
+                except Exception:
+                    it["start_ts"], it["end_ts"] = ANN_OPEN_START, ANN_OPEN_END
+
+    async def close(self) -> None:
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            while self._dirty:
+                path = self._dirty.pop()
+                # Shallow snapshot: entries are replaced, never mutated in place
+                data = dict(self.salah) if path == self.salah_file else list(self.announcements)
+                await asyncio.to_thread(_write_json, path, data)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(FLUSH_DELAY)
+        self._flush_task = None
+        await self._flush()
+
+    def _mark_dirty(self, path: str) -> None:
+        self._dirty.add(path)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def today_salah(self, today: str) -> Dict[str, Any]:
+        return await self.get_salah(today)
+
+    async def get_salah(self, d: str) -> Dict[str, Any]:
+        return self.salah.get(d, {"date": d})
+
+    async def recent_salah(self, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        for k in sorted(self.salah.keys(), reverse=True)[:limit]:
+            yield self.salah[k]
+
+    async def upsert_salah(self, d: str, fields: Dict[str, Any]) -> None:
+        self.salah[d] = {**self.salah.get(d, {}), **fields}
+        self._mark_dirty(self.salah_file)
+
+    async def upsert_salah_many(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        for d, fields in rows.items():
+            self.salah[d] = {**self.salah.get(d, {}), **fields}
+        if rows:
+            self._mark_dirty(self.salah_file)
+
+    async def active_announcements(self, now: int) -> List[Dict[str, Any]]:
+        result = []
+        for it in self.announcements:
+            if not it.get("active", True):
+                continue
+            if it["start_ts"] <= now <= it["end_ts"]:
+                result.append(it)
+        # sort by priority desc
+        result.sort(key=lambda x: int(x.get("priority", 1)), reverse=True)
+        # Same fields as the database projection; the ts columns (and their
+        # sentinels) are internal
+        return [{k: it.get(k) for k in ANN_FIELDS} for it in result[:ANN_LIMIT]]
+
+    async def create_announcement(self, item: Announcement) -> Any:
+        # Datetimes are stored as ISO strings
+        data = with_announcement_epochs(item.model_dump(mode="json"))
+        data["created_at"] = datetime.utcnow().isoformat()
+        self.announcements.append(data)
+        self._mark_dirty(self.ann_file)
+        return len(self.announcements)
+
+    async def list_assets(self, limit: int) -> List[Dict[str, Any]]:
+        # The listing is reused until the TTL expires or the directory mtime
+        # moves (any add/remove/rename)
+        key = f"assets:{limit}"
+        items = []
+        try:
+            mtime = os.stat(self.upload_dir).st_mtime_ns
+            cached = _cache_get(key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            # Newest first, like the database listing; scandir reports the entry type from
+            # the directory listing and a heap keeps only the top `limit` entries
+            with os.scandir(self.upload_dir) as it:
+                newest = heapq.nlargest(
+                    limit,
+                    (e for e in it if e.is_file(follow_symlinks=False)),
+                    key=lambda e: e.stat(follow_symlinks=False).st_mtime_ns,
+                )
+            for f in (e.name for e in newest):
+                items.append({
+                    "filename": f,
+                    "content_type": _content_type_for(os.path.splitext(f)[1].lower()),
+                    "path": f"/uploads/{f}",
+                })
+            _cache_set(key, (mtime, items), ASSETS_CACHE_TTL)
+        except Exception:
+            pass
+        return items
+
+    async def record_asset(self, asset: Asset) -> None:
+        # Nothing to persist; the file on disk is the record
+        _cache_invalidate("assets:")
+
+
+STORE: Store = MongoStore(db, SALAHS_FILE, ANN_FILE) if db is not None else JSONStore(SALAHS_FILE, ANN_FILE, UPLOAD_DIR)
+
+
+@app.on_event("startup")
+async def start_store():
+    await STORE.start()
+
+
+@app.on_event("shutdown")
+async def close_store():
+    await STORE.close()
+
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Masjid Display Backend Running"}
 
 
 @app.get("/api/hello")
-def hello():
+async def hello():
     return {"message": "Hello from the backend API!"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     """Test endpoint to check if database is available and accessible"""
     response = {
         "backend": "✅ Running",
@@ -81,7 +589,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -100,161 +608,134 @@ def test_database():
 
 # ---------------- Salah Times Endpoints ----------------
 
+@functools.lru_cache(maxsize=1)
+def _today_for_minute(epoch_minute: int) -> str:
+    return date.today().isoformat()
+
+
+def _today() -> str:
+    """Today's date (YYYY-MM-DD), computed at most once per minute"""
+    return _today_for_minute(int(time.time()) // 60)
+
+
 @app.get("/api/salah/today")
-def get_today_salah():
-    today = date.today().isoformat()
-    if db is None:
-        # Fallback to local JSON store
-        items = _read_json(SALAHS_FILE) or {}
-        return items.get(today, {"date": today})
-    doc = db["salahtime"].find_one({"date": today}, {"_id": 0})
-    return doc or {"date": today}
+async def get_today_salah(request: Request):
+    return _json_with_etag(request, await STORE.today_salah(_today()), "salah:today")
+
+
+async def _json_array(docs: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as a JSON array, one chunk per document as the cursor yields it"""
+    sep = b"["
+    async for doc in docs:
+        yield sep + orjson.dumps(doc)
+        sep = b","
+    yield b"]" if sep == b"," else b"[]"
 
 
 @app.get("/api/salah")
-def get_salah_by_date(d: Optional[str] = None):
-    if db is None:
-        # Fallback to local JSON store
-        store = _read_json(SALAHS_FILE) or {}
-        if d is None:
-            # return recent up to 30 by date desc
-            keys = sorted(store.keys(), reverse=True)[:30]
-            return [store[k] for k in keys]
-        return store.get(d, {"date": d})
+async def get_salah_by_date(request: Request, d: Optional[str] = None):
     if d is None:
-        # return recent 30 entries
-        cur = db["salahtime"].find({}, {"_id": 0}).sort("date", -1).limit(30)
-        return list(cur)
-    doc = db["salahtime"].find_one({"date": d}, {"_id": 0})
-    return doc or {"date": d}
+        # return recent 30 entries by date desc
+        return StreamingResponse(_json_array(STORE.recent_salah(30)), media_type="application/json")
+    return _json_with_etag(request, await STORE.get_salah(d))
 
 
 @app.post("/api/salah")
-def upsert_salah(item: SalahTime):
-    payload = item.model_dump()
-    # Ensure date is a JSON-serializable string
-    payload["date"] = item.date.isoformat()
+async def upsert_salah(item: SalahTime):
+    # mode="json" emits the date as an ISO string directly
+    payload = item.model_dump(mode="json")
     payload["updated_at"] = datetime.utcnow().isoformat()
 
-    if db is None:
-        # Fallback: write to local JSON store keyed by date
-        store = _read_json(SALAHS_FILE) or {}
-        store[payload["date"]] = payload
-        _write_json(SALAHS_FILE, store)
+    await STORE.upsert_salah(payload["date"], payload)
+    if STORE.fallback:
         return {"status": "ok", "date": payload["date"], "fallback": True}
-
-    db["salahtime"].update_one(
-        {"date": payload["date"]},
-        {"$set": {**payload, "updated_at": datetime.utcnow().isoformat()}},
-        upsert=True,
-    )
     return {"status": "ok", "date": payload["date"]}
 
 
 # ---------------- Announcements Endpoints ----------------
 
-@app.get("/api/announcements")
-def get_active_announcements():
-    now = datetime.utcnow()
-    if db is None:
-        # Fallback: read from JSON and filter like DB would
-        items: List[Dict[str, Any]] = _read_json(ANN_FILE) or []
-        result = []
-        for it in items:
-            if not it.get("active", True):
-                continue
-            start_at = it.get("start_at")
-            end_at = it.get("end_at")
-            try:
-                start_ok = (start_at is None) or (datetime.fromisoformat(start_at.replace("Z", "+00:00")) <= now)
-                end_ok = (end_at is None) or (datetime.fromisoformat(end_at.replace("Z", "+00:00")) >= now)
-            except Exception:
-                start_ok = True
-                end_ok = True
-            if start_ok and end_ok:
-                result.append(it)
-        # sort by priority desc
-        result.sort(key=lambda x: int(x.get("priority", 1)), reverse=True)
-        return result
+# "now" for the active-announcement filter is floored to this many seconds so
+# it (and the cached result tagged with it) is stable across a burst of polls
+ANN_NOW_BUCKET = 15
 
-    filt = {
-        "active": True,
-        "$and": [
-            {"$or": [{"start_at": None}, {"start_at": {"$lte": now}}]},
-            {"$or": [{"end_at": None}, {"end_at": {"$gte": now}}]},
-        ]
-    }
-    cur = db["announcement"].find(filt, {"_id": 0}).sort("priority", -1)
-    return list(cur)
+
+def _now_ts_bucket() -> int:
+    return int(time.time()) // ANN_NOW_BUCKET * ANN_NOW_BUCKET
+
+
+@app.get("/api/announcements")
+async def get_active_announcements(request: Request):
+    return _json_with_etag(request, await STORE.active_announcements(_now_ts_bucket()), "announcements")
 
 
 @app.post("/api/announcements")
-def create_announcement(item: Announcement):
-    if db is None:
-        # Fallback: append to JSON list
-        items: List[Dict[str, Any]] = _read_json(ANN_FILE) or []
-        data = item.model_dump()
-        data["created_at"] = datetime.utcnow().isoformat()
-        items.append(data)
-        _write_json(ANN_FILE, items)
-        return {"status": "ok", "id": len(items), "fallback": True}
-    _id = create_document("announcement", item)
+async def create_announcement(item: Announcement):
+    _id = await STORE.create_announcement(item)
+    if STORE.fallback:
+        return {"status": "ok", "id": _id, "fallback": True}
     return {"status": "ok", "id": _id}
 
 
 # ---------------- Assets Endpoints ----------------
 
+MAX_ASSETS_LIMIT = 200
+
+
 @app.get("/api/assets")
-def list_assets(limit: int = 20):
-    # If DB available, prefer it
-    if db is not None:
-        cur = db["asset"].find({}, {"_id": 0}).sort("created_at", -1).limit(int(limit))
-        return list(cur)
-
-    # Fallback: list files from uploads directory
-    items = []
-    try:
-        entries = sorted(
-            (f for f in os.listdir(UPLOAD_DIR) if os.path.isfile(os.path.join(UPLOAD_DIR, f))),
-            reverse=True,
-        )
-        for f in entries[: int(limit)]:
-            path = os.path.join(UPLOAD_DIR, f)
-            ctype, _ = mimetypes.guess_type(path)
-            items.append({
-                "filename": f,
-                "content_type": ctype or "application/octet-stream",
-                "path": f"/uploads/{f}",
-            })
-    except Exception:
-        pass
-    return items
+async def list_assets(request: Request, limit: int = 20):
+    limit = max(1, min(int(limit), MAX_ASSETS_LIMIT))
+    return _json_with_etag(request, await STORE.list_assets(limit), f"assets:{limit}")
 
 
 # ---------------- File Upload Endpoints ----------------
 
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w .-]+")
+
+
+def _copy_upload(src: BinaryIO, path: str) -> None:
+    with open(path, "wb") as out:
+        if not MAX_UPLOAD_BYTES:
+            shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+            return
+        written = 0
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Uploaded file is too large")
+            out.write(chunk)
+
+
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded")
-    filename = file.filename
-    # ensure unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-    name, ext = os.path.splitext(filename)
-    safe_name = f"{name}_{timestamp}{ext}"
+    # Drop any client-supplied directories and characters unsafe in a path
+    filename = _UNSAFE_FILENAME_CHARS.sub("_", os.path.basename(file.filename or "")).strip(" .")
+    name, ext = os.path.splitext(filename or "upload")
+    # ensure unique filename: the hex time_ns part keeps uploads with the same
+    # name distinct and sorting in upload order; the random part prevents a
+    # collision when two uploads land in the same nanosecond (e.g. two workers)
+    safe_name = f"{name}_{time.time_ns():x}{secrets.token_hex(4)}{ext}"
     save_path = os.path.join(UPLOAD_DIR, safe_name)
 
-    content = await file.read()
-    with open(save_path, "wb") as f:
-        f.write(content)
+    # Copy the spooled upload to disk in fixed-size chunks on a worker thread, so
+    # memory stays flat and there is one thread hop per upload rather than two per chunk
+    try:
+        await asyncio.to_thread(_copy_upload, file.file, save_path)
+    except Exception:
+        # Don't leave a truncated file behind for the listing or AI sync to pick up
+        try:
+            await aiofiles.os.remove(save_path)
+        except OSError:
+            pass
+        raise
 
     url = f"/uploads/{safe_name}"
 
     # Try to record in DB; if DB not available, still succeed
     try:
-        if db is not None:
-            meta = Asset(filename=safe_name, content_type=file.content_type or "application/octet-stream", path=url)
-            create_document("asset", meta)
+        meta = Asset(filename=safe_name, content_type=file.content_type or "application/octet-stream", path=url)
+        await STORE.record_asset(meta)
     except Exception:
         # Ignore DB errors for upload success
         pass
@@ -269,6 +750,10 @@ class AISyncRequest(BaseModel):
     commit: bool = Field(True, description="If true, save to store; otherwise preview only")
 
 
+class AISyncBulkRequest(BaseModel):
+    commit: bool = Field(True, description="If true, save to store; otherwise preview only")
+
+
 PRAYER_KEYS = [
     "fajr", "fajr_jamaat", "sunrise",
     "dhuhr", "dhuhr_jamaat",
@@ -276,93 +761,194 @@ PRAYER_KEYS = [
     "maghrib", "maghrib_jamaat",
     "isha", "isha_jamaat",
 ]
+_PRAYER_SET = frozenset(PRAYER_KEYS)
+# hour, then minutes after ':' or '.' (or as the last two of 3-4 digits, optionally
+# space-separated), then optional seconds. Anything after that which doesn't carry
+# on the number (am/pm, "*", "(Jamaat)") is ignored
+_TIME_RE = re.compile(r"\s*(\d{1,2})(?:\s*[:.]\s*(\d{1,2})(?:[:.]\d+)*|\s*(\d{2}))(?!\d|\s*[:.]\s*\d)")
 
 
 def _latest_upload() -> Optional[str]:
     try:
-        entries = [
-            os.path.join(UPLOAD_DIR, f)
-            for f in os.listdir(UPLOAD_DIR)
-            if os.path.isfile(os.path.join(UPLOAD_DIR, f))
-        ]
-        if not entries:
-            return None
-        entries.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-        return entries[0]
+        # One scandir pass: the entry type comes from the listing, so each file is stat'ed once
+        with os.scandir(UPLOAD_DIR) as it:
+            latest = max(
+                (e for e in it if e.is_file()),
+                key=lambda e: e.stat().st_mtime_ns,
+                default=None,
+            )
+        return latest.path if latest is not None else None
     except Exception:
         return None
 
 
-def _parse_csv(path: str) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
+# Sniffed CSV dialects per path, tagged with the file's st_mtime_ns (see _json_cache)
+_dialect_cache: Dict[str, Tuple[int, Any]] = {}
+
+
+def _parse_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of a CSV file as dicts keyed by the lowercased headers. Rows
+    are read lazily, so a caller that stops early never reads the rest of the file.
+    """
     with open(path, "r", encoding="utf-8") as f:
-        sniffer = csv.Sniffer()
-        sample = f.read(2048)
-        f.seek(0)
-        dialect = sniffer.sniff(sample) if sample else csv.excel
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        hit = _dialect_cache.get(path)
+        if hit is not None and hit[0] == mtime_ns:
+            dialect = hit[1]
+        else:
+            sample = f.read(2048)
+            f.seek(0)
+            dialect = csv.Sniffer().sniff(sample) if sample else csv.excel
+            _remember_file(_dialect_cache, path, mtime_ns, dialect)
         reader = csv.DictReader(f, dialect=dialect)
         for r in reader:
             # normalize keys to lowercase
-            norm = { (k or '').strip().lower(): (v or '').strip() for k, v in r.items() }
-            rows.append(norm)
-    return rows
+            yield { (k or '').strip().lower(): (v or '').strip() for k, v in r.items() }
+
+
+def _xlsx_cell(cell: Any) -> Any:
+    # calamine reports every number as float; match openpyxl so 615 doesn't become "615.0"
+    if cell is None:
+        return ""
+    if isinstance(cell, float) and cell.is_integer():
+        return int(cell)
+    return cell
 
 
-def _parse_xlsx(path: str) -> List[Dict[str, Any]]:
-    """Parse the first worksheet of an XLSX file into list of dict rows with lowercased headers."""
+def _parse_xlsx(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of the first worksheet of an XLSX file as dicts keyed by the
+    lowercased headers. Rows are read lazily, so a caller that stops early never
+    touches the rest of the sheet.
+    """
     try:
-        from openpyxl import load_workbook
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"XLSX support not available: {str(e)[:120]}")
-
-    wb = load_workbook(filename=path, data_only=True, read_only=True)
-    ws = wb.worksheets[0]
-
-    rows: List[List[Any]] = []
-    for row in ws.iter_rows(values_only=True):
-        rows.append([cell if cell is not None else "" for cell in row])
-    if not rows:
-        return []
-    headers = [str(h).strip().lower() for h in rows[0]]
-    out: List[Dict[str, Any]] = []
-    for r in rows[1:]:
-        item: Dict[str, Any] = {}
-        for idx, h in enumerate(headers):
-            if not h:
-                continue
-            val = r[idx] if idx < len(r) else ""
-            item[h] = str(val).strip()
-        out.append(item)
-    return out
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        CalamineWorkbook = None
+
+    if CalamineWorkbook is not None:
+        # Native reader; much faster than openpyxl's pure-Python XML parsing
+        wb = CalamineWorkbook.from_path(path)
+    else:
+        try:
+            from openpyxl import load_workbook
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"XLSX support not available: {str(e)[:120]}")
+
+        wb = load_workbook(filename=path, data_only=True, read_only=True)
+    # Either workbook keeps the file open until closed, including when the
+    # caller stops iterating early
+    try:
+        if CalamineWorkbook is not None:
+            rows = wb.get_sheet_by_index(0).iter_rows()
+        else:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        columns = [(idx, h) for idx, h in enumerate(str(_xlsx_cell(c)).strip().lower() for c in first) if h]
+        for r in rows:
+            yield {h: str(_xlsx_cell(r[idx])).strip() if idx < len(r) else "" for idx, h in columns}
+    finally:
+        wb.close()
+
+
+def _match_row(rows: Iterable[Dict[str, Any]], target_date: str) -> Optional[Dict[str, Any]]:
+    """The row whose date (or day) column is target_date, else the first row"""
+    first = None
+    for r in rows:
+        if first is None:
+            first = r
+        # try keys like 'date' or 'day'
+        d = r.get('date') or r.get('day')
+        if d and str(d).strip()[:10] == target_date:
+            return r
+    return first
 
 
 def _coerce_times(record: Dict[str, Any]) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
-    for k in PRAYER_KEYS:
-        v = record.get(k)
+    for k, v in record.items():
         if not v:
             continue
-        # Normalize common formats like 6:5 to 06:05, and remove am/pm if present
-        t = str(v).strip().lower().replace('.', ':').replace(' ', '')
-        # Convert times like 615 to 06:15
-        if ':' not in t and t.isdigit() and 3 <= len(t) <= 4:
-            # e.g., 615 -> 6:15, 0915 -> 09:15
-            t = f"{t[:-2]}:{t[-2:]}"
-        # remove am/pm after adding colon if needed
-        t = t.replace('am', '').replace('pm', '')
-        if ':' in t:
-            parts = t.split(':')
-            try:
-                hh = int(parts[0])
-                mm = int(parts[1][:2])
-                out[k] = f"{hh:02d}:{mm:02d}"
-            except Exception:
-                continue
+        # Header case varies between sources (Fajr, FAJR, fajr)
+        k = k.lower()
+        if k not in _PRAYER_SET:
+            continue
+        # Normalize common formats like 6:5, 6.15, 615 or 06:15:00 pm to HH:MM
+        m = _TIME_RE.match(str(v))
+        if m:
+            out[k] = f"{int(m[1]):02d}:{int(m[2] or m[3]):02d}"
+    return out
+
+
+def _extract_times(path: str, ext: str, target_date: str) -> Dict[str, Any]:
+    """Pull prayer times for target_date out of an uploaded CSV/JSON/XLSX timetable."""
+    extracted: Dict[str, Any] = {}
+    # CSV and XLSX rows are read lazily; _match_row stops at the matching row
+    if ext == ".csv":
+        match = _match_row(_parse_csv(path), target_date)
+        if match:
+            extracted.update(_coerce_times(match))
+    elif ext == ".json":
+        data = _read_json(path)
+        if isinstance(data, dict):
+            row = data.get(target_date)
+            if isinstance(row, dict):
+                extracted.update(_coerce_times(row))
+        if isinstance(data, list):
+            for r in data:
+                if isinstance(r, dict) and (str(r.get('date')) == target_date):
+                    extracted.update(_coerce_times(r))
+                    break
+    elif ext == ".xlsx":
+        match = _match_row(_parse_xlsx(path), target_date)
+        if match:
+            extracted.update(_coerce_times(match))
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type for AI sync: {ext}. Use CSV, JSON, or XLSX.")
+    return extracted
+
+
+def _row_date(value: Any) -> Optional[str]:
+    """ISO date for a row's date cell (date, datetime or string), or None if it isn't one"""
+    try:
+        return date.fromisoformat(str(value).strip()[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _extract_all_times(path: str, ext: str) -> Dict[str, Dict[str, Any]]:
+    """Prayer times for every dated row of an uploaded CSV/JSON/XLSX timetable, keyed by date."""
+    if ext == ".csv":
+        rows: Iterable[Any] = _parse_csv(path)
+    elif ext == ".xlsx":
+        rows = _parse_xlsx(path)
+    elif ext == ".json":
+        data = _read_json(path)
+        if isinstance(data, dict):
+            rows = ({**r, "date": d} for d, r in data.items() if isinstance(r, dict))
+        else:
+            rows = data if isinstance(data, list) else []
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type for AI sync: {ext}. Use CSV, JSON, or XLSX.")
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        if not isinstance(r, dict):
+            continue
+        d = _row_date(r.get('date') or r.get('day'))
+        if d is None:
+            continue
+        times = _coerce_times(r)
+        if times:
+            out[d] = times
     return out
 
 
 @app.post("/api/sync/ai")
-def ai_sync(req: AISyncRequest):
+async def ai_sync(req: AISyncRequest):
     """
     Lightweight AI-style sync: looks for the most recent uploaded CSV/JSON/XLSX timetable,
     extracts times for the requested date, and optionally commits them.
@@ -377,7 +963,7 @@ def ai_sync(req: AISyncRequest):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD")
 
-    path = _latest_upload()
+    path = await asyncio.to_thread(_latest_upload)
     if not path:
         raise HTTPException(status_code=404, detail="No uploaded files found to sync from")
 
@@ -387,50 +973,8 @@ def ai_sync(req: AISyncRequest):
     extracted: Dict[str, Any] = {"date": target_date}
 
     try:
-        if ext == ".csv":
-            rows = _parse_csv(path)
-            # Try to pick row matching date
-            match = None
-            for r in rows:
-                # try keys like 'date' or 'day'
-                d = r.get('date') or r.get('day')
-                if d:
-                    d = str(d).strip()[:10]
-                if d == target_date:
-                    match = r
-                    break
-            if match is None and rows:
-                # fallback first row
-                match = rows[0]
-            if match:
-                extracted.update(_coerce_times(match))
-        elif ext == ".json":
-            data = _read_json(path)
-            if isinstance(data, dict):
-                row = data.get(target_date)
-                if isinstance(row, dict):
-                    extracted.update(_coerce_times({k.lower(): v for k, v in row.items()}))
-            if isinstance(data, list):
-                for r in data:
-                    if isinstance(r, dict) and (str(r.get('date')) == target_date):
-                        extracted.update(_coerce_times({k.lower(): v for k, v in r.items()}))
-                        break
-        elif ext == ".xlsx":
-            rows = _parse_xlsx(path)
-            match = None
-            for r in rows:
-                d = r.get('date') or r.get('day')
-                if d:
-                    d = str(d).strip()[:10]
-                if d == target_date:
-                    match = r
-                    break
-            if match is None and rows:
-                match = rows[0]
-            if match:
-                extracted.update(_coerce_times(match))
-        else:
-            raise HTTPException(status_code=415, detail=f"Unsupported file type for AI sync: {ext}. Use CSV, JSON, or XLSX.")
+        # Parsing the timetable is blocking file/CPU work; keep it off the event loop
+        extracted.update(await asyncio.to_thread(_extract_times, path, ext, target_date))
     except HTTPException:
         raise
     except Exception as e:
@@ -444,22 +988,10 @@ def ai_sync(req: AISyncRequest):
         # Commit to DB or fallback store
         payload = {
             **{k: extracted.get(k) for k in PRAYER_KEYS if extracted.get(k)},
-            "date": target_date
+            "date": target_date,
+            "updated_at": datetime.utcnow().isoformat(),
         }
-        # Use existing upsert logic
-        if db is None:
-            store = _read_json(SALAHS_FILE) or {}
-            existing = store.get(target_date, {})
-            existing.update(payload)
-            existing["updated_at"] = datetime.utcnow().isoformat()
-            store[target_date] = existing
-            _write_json(SALAHS_FILE, store)
-        else:
-            db["salahtime"].update_one(
-                {"date": target_date},
-                {"$set": {**payload, "updated_at": datetime.utcnow().isoformat()}},
-                upsert=True,
-            )
+        await STORE.upsert_salah_many({target_date: payload})
 
     return {
         "status": "ok",
@@ -469,7 +1001,49 @@ def ai_sync(req: AISyncRequest):
     }
 
 
+@app.post("/api/sync/ai/bulk")
+async def ai_sync_bulk(req: AISyncBulkRequest):
+    """
+    Like /api/sync/ai, but imports every dated row of the latest upload at once:
+    the file is parsed a single time and all dates are committed in one batch.
+    """
+    path = await asyncio.to_thread(_latest_upload)
+    if not path:
+        raise HTTPException(status_code=404, detail="No uploaded files found to sync from")
+
+    _, ext = os.path.splitext(path)
+    ext = ext.lower()
+
+    try:
+        extracted = await asyncio.to_thread(_extract_all_times, path, ext)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to parse source file: {str(e)[:120]}")
+
+    if not extracted:
+        raise HTTPException(status_code=422, detail="Could not extract any dated times from the latest upload. Ensure CSV/JSON/XLSX has a date column and columns like fajr, fajr_jamaat, ...")
+
+    if req.commit:
+        updated_at = datetime.utcnow().isoformat()
+        await STORE.upsert_salah_many({
+            d: {**times, "date": d, "updated_at": updated_at} for d, times in extracted.items()
+        })
+
+    return {
+        "status": "ok",
+        "source": os.path.basename(path),
+        "committed": req.commit,
+        "count": len(extracted),
+        "data": [{"date": d, **extracted[d]} for d in sorted(extracted)],
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # One worker per core; the JSON fallback store lives in process memory,
+    # so without a database everything must stay in a single worker
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)) if db is not None else 1
+    # "auto" picks uvloop and httptools (installed via uvicorn[standard]) when available
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, loop="auto", http="auto")